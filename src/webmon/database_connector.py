@@ -1,6 +1,7 @@
-from abc import ABC, abstractmethod
+import functools
+from abc import abstractmethod
 from enum import Enum
-from typing import List
+from typing import AsyncContextManager, AsyncIterator, FrozenSet, List, Optional, Type, Union
 
 import pydantic
 
@@ -36,6 +37,10 @@ class DatabaseConnector:
     async def close(self) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def scope(self) -> AsyncContextManager[None]:
+        raise NotImplementedError
+
     @abstractmethod
     async def execute_create_table(self, table_name: str, obj: pydantic.BaseModel) -> None:
         raise NotImplementedError
@@ -44,35 +49,84 @@ class DatabaseConnector:
     async def execute_drop_table(self, table_name: str) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def execute_drop_tables(self, table_names: List[str]) -> None:
+        raise NotImplementedError
+
     @abstractmethod
     async def execute_insert_many_into_table(self, table_name: str, objs: List[pydantic.BaseModel]) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def execute_copy_many_into_table(self, table_name: str, objs: List[pydantic.BaseModel]) -> None:
+        raise NotImplementedError
+
     @abstractmethod
     async def fetch_all_from_table(self, table_name: str, cls: pydantic.BaseModel) -> List[pydantic.BaseModel]:
         raise NotImplementedError
 
+    @abstractmethod
+    def iterate_all_from_table(self, table_name: str, cls: pydantic.BaseModel) -> AsyncIterator[pydantic.BaseModel]:
+        raise NotImplementedError
+
+    @staticmethod
+    def get_model_class(obj: Union[pydantic.BaseModel, Type[pydantic.BaseModel]]) -> Type[pydantic.BaseModel]:
+        """Returns the pydantic class of obj, which can be either an instance or the class itself.
+
+        :param obj: pydantic object or class.
+        :return: pydantic class.
+        :rtype: type
+        """
+        return obj if isinstance(obj, type) else type(obj)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_enum_fields(cls: Type[pydantic.BaseModel]) -> FrozenSet[str]:
+        """Returns the names of the fields of a pydantic class whose type is an Enum. The result is cached per class.
+
+        :param cls: pydantic class object reference value.
+        :return: set of field names.
+        :rtype: frozenset
+        """
+        return frozenset(key for key, field in cls.model_fields.items() if isinstance(field.annotation, type) and issubclass(field.annotation, Enum))
+
     @staticmethod
     def row_to_pydantic(row: dict, cls: pydantic.BaseModel) -> pydantic.BaseModel:
         """Convert a row representation to a given pydantic object.
-        Required because pydantic doesn't accept None values.
 
-        If a value is None then it will be initialized as follows:
-            If of type string then to ''
-            If of type int then to 0
+        Pydantic doesn't accept None values, so the query that fetched the row is expected to have replaced them
+        with defaults (eg: '' for strings and 0 for integers).
 
         :param row: dict representation of the row.
         :param cls: pydantic class object reference value.
         :return: instance of the parameter class with values set to the ones in row.
         :rtype: pydantic.BaseModel
         """
-        schema_dict = cls.model_json_schema()["properties"]
-        for key, val in row.items():
-            if val is None:
-                valtype = schema_dict[key]['type']
-                if valtype == 'string':
-                    row[key] = ''
-                elif valtype == 'integer':
-                    row[key] = 0
         res = cls.model_validate(row)
         return res
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_list_adapter(cls: Type[pydantic.BaseModel]) -> pydantic.TypeAdapter:
+        """Returns a type adapter to validate a list of a pydantic class. The result is cached per class.
+
+        :param cls: pydantic class object reference value.
+        :return: type adapter for a list of cls.
+        :rtype: pydantic.TypeAdapter
+        """
+        return pydantic.TypeAdapter(List[cls])  # type: ignore
+
+    @staticmethod
+    def json_to_pydantic_list(rows_json: Optional[str], cls: pydantic.BaseModel) -> List[pydantic.BaseModel]:
+        """Convert a JSON array of rows to a list of pydantic objects, parsing and validating all rows in a single call.
+
+        Same as in `row_to_pydantic`, the rows aren't expected to have None values.
+
+        :param rows_json: JSON array with an object per row. None is considered an empty array.
+        :param cls: pydantic class object reference value.
+        :return: list of instances of the parameter class.
+        :rtype: list
+        """
+        if rows_json is None:
+            return []
+        return DatabaseConnector.get_list_adapter(cls).validate_json(rows_json)
@@ -1,4 +1,3 @@
-import asyncio
 from enum import Enum
 from types import SimpleNamespace
 
@@ -18,8 +17,11 @@ class DatabaseConnectorFactory():
 
     async def get_connector(self) -> "DatabaseConnector":
         cfg = SimpleNamespace(**{k: v for k, v in self.db_config.items()})
+        # optional settings, when missing the connector defaults are used
+        optional_keys = {'db_pool_min_size': int, 'db_pool_max_size': int, 'db_statement_cache_size': int, 'db_acquire_timeout': float}
+        optional_cfg = {k: conv(self.db_config[k]) for k, conv in optional_keys.items() if k in self.db_config}
         if self.db_type == DatabaseType.POSTGRESQL:
-            dbc = DatabaseConnectorPostgresql(cfg.db_user, cfg.db_pass, cfg.db_name, cfg.db_host, cfg.db_port, cfg.db_ssl)
+            dbc = DatabaseConnectorPostgresql(cfg.db_user, cfg.db_pass, cfg.db_name, cfg.db_host, cfg.db_port, cfg.db_ssl, **optional_cfg)
         else:
             raise NotImplementedError
         return dbc
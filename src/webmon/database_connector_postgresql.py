@@ -1,8 +1,13 @@
-import asyncio
+import contextlib
+import functools
 import logging
-from collections import OrderedDict
-from enum import Enum
-from typing import Any, Dict, List, Tuple
+import operator
+import os
+import random
+from contextvars import ContextVar
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Callable, List, Mapping, Optional, Tuple, Type
 
 import asyncpg
 import pydantic
@@ -12,12 +17,39 @@ from .retry import retry
 
 logger = logging.getLogger("webmonitor")
 
+# SQL column type for each python type
+_SQL_TYPE_MAP = MappingProxyType({
+    int: 'INT',
+    float: 'FLOAT',
+    str: 'TEXT',
+    datetime: 'TIMESTAMP',
+})
+# SQL value used in place of NULL for each python type that doesn't accept None
+_SQL_NULL_DEFAULTS = MappingProxyType({
+    str: "''",
+    int: '0',
+})
+# max size of the connection pool when not configured, so that large hosts don't run out of DB connections (`max_connections`)
+_DEFAULT_POOL_MAX_SIZE_CAP = 10
+# connections acquired by `DatabaseConnectorPostgresql.scope` for the current task, by connector
+_scoped_conns: 'ContextVar[Mapping[DatabaseConnectorPostgresql, asyncpg.Connection]]' = ContextVar('scoped_conns', default=MappingProxyType({}))
+
 
 class DatabaseConnectorPostgresql(DatabaseConnector):
     """DB connection module to PostgreSQL.
     """
 
-    def __init__(self, db_user: str, db_pass: str, db_name: str, db_host: str, db_port: int, db_ssl: str) -> None:
+    def __init__(self,
+                 db_user: str,
+                 db_pass: str,
+                 db_name: str,
+                 db_host: str,
+                 db_port: int,
+                 db_ssl: str,
+                 db_pool_min_size: Optional[int] = None,
+                 db_pool_max_size: Optional[int] = None,
+                 db_statement_cache_size: int = 128,
+                 db_acquire_timeout: float = 5) -> None:
         """Constructor method.
 
         Lazy initialization.
@@ -28,21 +60,78 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
         :param db_host: The host address of the database server.
         :param db_port: The port number on which the database server is listening.
         :param db_ssl: Indicates whether SSL should be used for the connection.
+        :param db_pool_min_size: Number of connections the pool is initialized with. Defaults to the max size (ie a pre-warmed pool).
+        :param db_pool_max_size: Max number of connections in the pool, ie max number of concurrent queries.
+            Defaults to `(2 * number of CPUs) + 1`, as per the PostgreSQL wiki formula with one effective spindle, up to 10.
+        :param db_statement_cache_size: Max number of prepared statements kept per connection (least recently used are evicted).
+        :param db_acquire_timeout: Seconds to wait for a free pool connection before failing (and letting `retry` back off).
         """
         super().__init__(db_user, db_pass, db_name, db_host, db_port, db_ssl)
+        # capped since all these connections are opened on startup, and the app only needs one per healthcheck writer plus one
+        default_max_size = min(2 * (os.cpu_count() or 1) + 1, _DEFAULT_POOL_MAX_SIZE_CAP)
+        self.db_pool_max_size = db_pool_max_size if db_pool_max_size is not None else default_max_size
+        self.db_pool_min_size = db_pool_min_size if db_pool_min_size is not None else self.db_pool_max_size
+        self.db_statement_cache_size = db_statement_cache_size
+        self.db_acquire_timeout = db_acquire_timeout
         self.conn_pool = None
 
     async def open(self) -> None:
+        logger.info("Opening DB connection pool with min size %d and max size %d", self.db_pool_min_size, self.db_pool_max_size)
+        # the pool opens min_size connections upfront, and idle connections are kept open
         self.conn_pool = await asyncpg.create_pool(user=self.db_user,
                                                    password=self.db_pass,
                                                    database=self.db_name,
                                                    host=self.db_host,
                                                    port=self.db_port,
-                                                   ssl=self.db_ssl)
+                                                   ssl=self.db_ssl,
+                                                   min_size=self.db_pool_min_size,
+                                                   max_size=self.db_pool_max_size,
+                                                   max_inactive_connection_lifetime=0,
+                                                   statement_cache_size=self.db_statement_cache_size)
 
     async def close(self) -> None:
         await self.conn_pool.close()  # type: ignore
 
+    @contextlib.asynccontextmanager
+    async def scope(self) -> AsyncIterator[None]:
+        """Runs all queries made inside the block on a single pool connection, instead of acquiring one per query.
+
+        Don't use it around concurrent tasks, since tasks created inside the block inherit the connection and
+        a connection can only run one query at a time.
+        """
+        if self.get_scoped_conn() is not None:
+            # nested scope, keep using the outer connection
+            yield
+            return
+        async with self.conn_pool.acquire(timeout=self.get_acquire_timeout()) as conn:  # type: ignore
+            # never change the mapping in place, since the tasks created inside a scope share it with their copy of the context
+            token = _scoped_conns.set(MappingProxyType({**_scoped_conns.get(), self: conn}))
+            try:
+                yield
+            finally:
+                _scoped_conns.reset(token)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        """Returns the connection of the current scope, or else acquires one from the pool.
+        """
+        conn = self.get_scoped_conn()
+        if conn is not None:
+            yield conn
+        else:
+            async with self.conn_pool.acquire(timeout=self.get_acquire_timeout()) as conn:  # type: ignore
+                yield conn
+
+    def get_scoped_conn(self) -> Optional[asyncpg.Connection]:
+        """Returns the connection acquired by `scope` for the current task, or None if outside a scope.
+        """
+        return _scoped_conns.get().get(self)
+
+    def get_acquire_timeout(self) -> float:
+        """Returns the pool acquire timeout with up to 20% of jitter, so that waiting tasks don't all time out (and retry) at once.
+        """
+        return self.db_acquire_timeout * random.uniform(1, 1.2)
+
     @retry(tries=5, delay=30, backoff=2, max_interval=120, logger=logger)
     async def db_fetch(self, query: str) -> List[dict]:
         """Runs query and returns results.
@@ -50,7 +139,7 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
         :return: query results.
         """
         result = []
-        async with self.conn_pool.acquire() as conn:  # type: ignore
+        async with self.acquire() as conn:
             result = await conn.fetch(query)
         return result
 
@@ -58,15 +147,57 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
     async def db_execute(self, query: str) -> None:
         """Runs query.
         """
-        async with self.conn_pool.acquire() as conn:  # type: ignore
+        async with self.acquire() as conn:
             await conn.execute(query)
 
     @retry(tries=5, delay=30, backoff=2, max_interval=120, logger=logger)
-    async def db_executemany(self, query: str, data: dict) -> None:
-        """Runs query.
+    async def db_executemany(self, query: str, data: List[Tuple[Any, ...]]) -> None:
+        """Runs a parameterized query once for each entry in data.
+
+        The query is prepared once per connection and reused from asyncpg's statement cache.
+        Note that `Connection.prepare()` bypasses that cache, so it isn't used here.
+        All executions run inside a single transaction so there is only one commit per batch.
+
+        :param query: SQL query with `$1..$N` placeholders.
+        :param data: list of tuples with the values for each execution.
         """
-        async with self.conn_pool.acquire() as conn:  # type: ignore
-            await conn.executemany(query, data)
+        async with self.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(query, data)
+
+    @retry(tries=5, delay=30, backoff=2, max_interval=120, logger=logger)
+    async def db_pipeline(self, ops: List[Tuple[str, Tuple[Any, ...]]]) -> List[List[Any]]:
+        """Runs multiple queries back-to-back on a single connection and transaction.
+        Avoids acquiring a pool connection and committing once per query.
+
+        :param ops: list of tuples with the query and its arguments.
+        :return: list with the results of each query.
+        """
+        async with self.acquire() as conn:
+            async with conn.transaction():
+                return [await conn.fetch(query, *args) for query, args in ops]
+
+    @retry(tries=5, delay=30, backoff=2, max_interval=120, logger=logger)
+    async def db_copy_records(self, table_name: str, columns: List[str], records: List[Tuple[Any, ...]], conflict_columns: List[str]) -> None:
+        """Bulk loads records using the COPY protocol.
+
+        COPY doesn't support ON CONFLICT, so if there are conflict columns the records are first copied into a
+        temporary table and then moved into the target table ignoring any conflicts.
+
+        :param table_name: table name.
+        :param columns: column names matching the order of the values in each record.
+        :param records: list of tuples with the values to insert.
+        :param conflict_columns: columns for which conflicting rows should be ignored.
+        """
+        async with self.acquire() as conn:
+            if not conflict_columns:
+                await conn.copy_records_to_table(table_name, records=records, columns=columns)
+                return
+            temp_table_name = f"tmp_{table_name}"
+            async with conn.transaction():
+                await conn.execute(DatabaseConnectorPostgresql.get_query_create_temp_table(temp_table_name, table_name, columns))
+                await conn.copy_records_to_table(temp_table_name, records=records, columns=columns)
+                await conn.execute(DatabaseConnectorPostgresql.get_query_insert_from_table(table_name, temp_table_name, columns, conflict_columns))
 
     async def fetch_version(self) -> str:
         """Returns DB version.
@@ -87,15 +218,28 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
         :return: a list of instances of cls representing the returned rows
         :rtype: list
         """
-        query = DatabaseConnectorPostgresql.get_query_select_all(table_name)
+        query = DatabaseConnectorPostgresql.get_query_select_all_json(table_name, cls)
         reply = await self.db_fetch(query)
-        res = []
-        for row in reply:
-            row = dict(row)
-            row = DatabaseConnector.row_to_pydantic(row, cls)
-            res += [row]
+        res = DatabaseConnector.json_to_pydantic_list(reply[0][0], cls)
         return res
 
+    async def iterate_all_from_table(self, table_name: str, cls: pydantic.BaseModel, prefetch: int = 1000) -> AsyncIterator[pydantic.BaseModel]:
+        """Yields all rows in table, streaming them from a server side cursor.
+        Unlike `fetch_all_from_table` only `prefetch` rows are kept in memory at any time.
+
+        :param table_name: table name
+        :param cls: pydantic class object reference value.
+        :param prefetch: number of rows to fetch from the server on each round trip.
+        :return: an async iterator of instances of cls representing the returned rows
+        :rtype: AsyncIterator
+        """
+        query = DatabaseConnectorPostgresql.get_query_select_all(table_name, cls)  # type: ignore
+        async with self.acquire() as conn:
+            # cursors can only be used inside a transaction
+            async with conn.transaction():
+                async for record in conn.cursor(query, prefetch=prefetch):
+                    yield DatabaseConnector.row_to_pydantic(dict(record), cls)
+
     async def execute_create_table(self, table_name: str, obj: pydantic.BaseModel) -> None:
         """Creates a table if it doesn't exist. The rows and their type are matched to the pydantic object.
 
@@ -113,6 +257,14 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
         query = DatabaseConnectorPostgresql.get_query_drop_table(table_name)
         await self.db_execute(query)
 
+    async def execute_drop_tables(self, table_names: List[str]) -> None:
+        """Drop multiple tables in a single transaction.
+
+        :param table_names: table names, dropped in the given order.
+        """
+        ops = [(DatabaseConnectorPostgresql.get_query_drop_table(table_name), ()) for table_name in table_names]
+        await self.db_pipeline(ops)
+
     async def execute_insert_into_table(self, table_name: str, obj: pydantic.BaseModel) -> None:
         """Inserts the corresponding row representation of obj into a table.
 
@@ -128,9 +280,44 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
         :param table_name: table name.
         :param obj: list of object values to insert in the table.
         """
+        if not objs:
+            return
         query, data = DatabaseConnectorPostgresql.get_query_insert_many_into_table(table_name, objs, True)
         await self.db_executemany(query, data)
 
+    async def execute_copy_many_into_table(self, table_name: str, objs: List[pydantic.BaseModel]) -> None:
+        """Bulk loads the corresponding row representation of objs into a table. Faster than inserting for large lists.
+
+        :param table_name: table name.
+        :param objs: list of object values to insert in the table.
+        """
+        if not objs:
+            return
+        columns, columns_conflict, rows = DatabaseConnectorPostgresql.get_columns_rows_many_into_table(objs, True)
+        await self.db_copy_records(table_name, columns, rows, columns_conflict)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_columns_spec(cls: Type[pydantic.BaseModel], use_name_hints: bool) -> Tuple[Tuple[str, str, bool, bool], ...]:
+        """Returns the column definitions for a pydantic class. The result is cached per class.
+
+        :param cls: pydantic class object reference value.
+        :param use_name_hints: if True it will use the field name to set column properties (see `get_query_create_table`).
+        :return: a tuple of (column name, SQL type, is primary key, is unique) for each field.
+        :rtype: tuple
+        """
+        columns = []
+        enum_fields = DatabaseConnector.get_enum_fields(cls)
+        for key, field in cls.model_fields.items():
+            if key in enum_fields:
+                sql_type = _SQL_TYPE_MAP[int]
+            else:
+                sql_type = _SQL_TYPE_MAP[field.annotation]  # type: ignore
+            is_id = use_name_hints and (key == 'id' or key.endswith('_id'))
+            is_uq = use_name_hints and key.endswith('_uq')
+            columns.append((key, sql_type, is_id, is_uq))
+        return tuple(columns)
+
     @staticmethod
     def get_query_create_table(table_name: str, obj: pydantic.BaseModel, use_name_hints: bool) -> str:
         """Generate SQL query to create table. The rows and their type are matched to the pydantic object.
@@ -143,32 +330,31 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
         :return: SQL query.
         :rtype: string
         """
-        mappings = {
-            'int': 'INT',
-            'integer': 'INT',
-            'number': 'FLOAT',
-            'float': 'FLOAT',
-            'enum': 'INT',
-            'str': 'TEXT',
-            'string': 'TEXT',
-            'datetime': 'DATETIME'
-        }
-        query = f"CREATE TABLE IF NOT EXISTS {table_name} (\n"
-        schema_dict = obj.model_json_schema()
+        cls = DatabaseConnector.get_model_class(obj)
+        return DatabaseConnectorPostgresql.get_query_create_table_template(table_name, cls, use_name_hints)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def get_query_create_table_template(table_name: str, cls: Type[pydantic.BaseModel], use_name_hints: bool) -> str:
+        """Generate SQL query to create table for a pydantic class. The result is cached per table and class.
+
+        :param table_name: table name.
+        :param cls: pydantic class object reference value.
+        :param use_name_hints: see `get_query_create_table`.
+        :return: SQL query.
+        :rtype: string
+        """
+        parts = []
         primary_key = ''
-        for key, value in schema_dict["properties"].items():
-            if issubclass(obj.__annotations__[key], Enum) or isinstance(obj.__annotations__[key], Enum):
-                value = mappings['int']
-            else:
-                value = mappings[value['type']]
-            if use_name_hints and (key == 'id' or key.endswith('_id')):
-                query += f"{key} SERIAL,\n"
+        for key, value, is_id, is_uq in DatabaseConnectorPostgresql.get_columns_spec(cls, use_name_hints):
+            if is_id:
+                parts.append(f"{key} SERIAL")
                 primary_key = f",\nPRIMARY KEY ({key})\n"
-            elif use_name_hints and (key.endswith('_uq')):
-                query += f"{key} {value} UNIQUE,\n"
+            elif is_uq:
+                parts.append(f"{key} {value} UNIQUE")
             else:
-                query += f"{key} {value},\n"
-        query = query[:-2] + primary_key + ");"
+                parts.append(f"{key} {value}")
+        query = f"CREATE TABLE IF NOT EXISTS {table_name} (\n" + ",\n".join(parts) + primary_key + ");"
         return query
 
     @staticmethod
@@ -183,44 +369,77 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
         return query
 
     @staticmethod
-    def get_query_insert_many_into_table(table_name: str, objs: List[pydantic.BaseModel], use_name_hints: bool) -> Tuple[str, List[Tuple[Any, ...]]]:
-        """Generate SQL query to insert row into table. The new row will match the pydantic object.
+    @functools.lru_cache(maxsize=None)
+    def get_insert_plan(cls: Type[pydantic.BaseModel],
+                        use_name_hints: bool) -> Tuple[Tuple[str, ...], Tuple[str, ...], Callable[[pydantic.BaseModel], Tuple[Any, ...]]]:
+        """Returns how instances of a pydantic class are converted to rows. The result is cached per class.
 
-        :param table_name: table name.
-        :param objs: list of objects to be converted and inserted as a row.
+        :param cls: pydantic class object reference value.
         :param use_name_hints: if True it will handle some fields in a special form
             If the name is either `id` or ending with substring `_id` then it will ignore it (ie primary key).
-            If the name ends in substring `_uq` then the query will set to ignore conflicts.
-        :return: a tuple with the SQL query and the data.
-        :rtype: tuple(string, dict)
+            If the name ends in substring `_uq` then it will be listed as a conflict column.
+        :return: a tuple with the column names, the conflict column names, and a function that packs an object into a row.
+        :rtype: tuple(tuple, tuple, callable)
         """
+        columns: List[str] = []
+        columns_conflict: List[str] = []
+        enum_indexes: List[int] = []
+        enum_fields = DatabaseConnector.get_enum_fields(cls)
+        # the field names were already classified when computing the column definitions
+        for key, _, is_id, is_uq in DatabaseConnectorPostgresql.get_columns_spec(cls, use_name_hints):
+            if is_id:
+                continue
+            if is_uq:
+                columns_conflict.append(key)
+            if key in enum_fields:
+                enum_indexes.append(len(columns))
+            columns.append(key)
+        getter = operator.attrgetter(*columns)
+
+        def pack(obj: pydantic.BaseModel) -> Tuple[Any, ...]:
+            values = getter(obj)
+            if len(columns) == 1:
+                values = (values, )
+            if enum_indexes:
+                vals = list(values)
+                # convert any enum fields to integers
+                for idx in enum_indexes:
+                    vals[idx] = int(vals[idx].value)
+                return tuple(vals)
+            return values
+
+        return tuple(columns), tuple(columns_conflict), pack
 
+    @staticmethod
+    def get_columns_rows_many_into_table(objs: List[pydantic.BaseModel],
+                                         use_name_hints: bool) -> Tuple[List[str], List[str], List[Tuple[Any, ...]]]:
+        """Convert pydantic objects to the column names and row values to be inserted into a table.
+
+        :param objs: list of objects to be converted into rows. All objects must be of the same type.
+        :param use_name_hints: see `get_insert_plan`.
+        :return: a tuple with the column names, the conflict column names, and the rows values.
+        :rtype: tuple(list, list, list)
+        """
+        if not objs:
+            return [], [], []
+        columns, columns_conflict, pack = DatabaseConnectorPostgresql.get_insert_plan(type(objs[0]), use_name_hints)
+        rows = [pack(obj) for obj in objs]
+        return list(columns), list(columns_conflict), rows
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def get_query_insert_template(table_name: str, cls: Type[pydantic.BaseModel], use_name_hints: bool) -> str:
+        """Generate SQL query to insert rows of a pydantic class into a table. The result is cached per table and class.
+
+        :param table_name: table name.
+        :param cls: pydantic class object reference value.
+        :param use_name_hints: see `get_query_insert_many_into_table`.
+        :return: SQL query with `$1..$N` placeholders.
+        :rtype: string
+        """
         query_template = 'INSERT INTO {table_name} ({columns}) VALUES ({placeholders}) {conflict_expression};'
-        rows = []
-        for obj in objs:
-            columns = []
-            columns_conflict = []
-            placeholders = []
-            row = OrderedDict()
-            data = obj.model_dump(exclude_unset=True)
-            # convert any enum fields to integers
-            for key, value in data.items():
-                if isinstance(value, Enum):
-                    data[key] = int(value.value)
-            # process all fields
-            for key, value in data.items():
-                if use_name_hints and (key == "id" or key.endswith("_id")):
-                    continue
-                elif use_name_hints and key.endswith("_uq"):
-                    columns.append(key)
-                    columns_conflict.append(key)
-                    placeholders.append(f"${len(columns)}")
-                    row[key] = value
-                else:
-                    columns.append(key)
-                    placeholders.append(f"${len(columns)}")
-                    row[key] = value
-            rows.append(tuple(row.values()))
+        columns, columns_conflict, _ = DatabaseConnectorPostgresql.get_insert_plan(cls, use_name_hints)
+        placeholders = [f"${idx}" for idx in range(1, len(columns) + 1)]
         # construct the query
         columns_str = ', '.join(columns)
         placeholders_str = ', '.join(placeholders)
@@ -229,8 +448,58 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
                                       columns=columns_str,
                                       placeholders=placeholders_str,
                                       conflict_expression=conflict_expression)
+        return query
+
+    @staticmethod
+    def get_query_insert_many_into_table(table_name: str, objs: List[pydantic.BaseModel], use_name_hints: bool) -> Tuple[str, List[Tuple[Any, ...]]]:
+        """Generate SQL query to insert row into table. The new row will match the pydantic object.
+
+        :param table_name: table name.
+        :param objs: list of objects to be converted and inserted as a row. All objects must be of the same type.
+        :param use_name_hints: if True it will handle some fields in a special form
+            If the name is either `id` or ending with substring `_id` then it will ignore it (ie primary key).
+            If the name ends in substring `_uq` then the query will set to ignore conflicts.
+        :return: a tuple with the SQL query and the data. The query is empty if there are no objects.
+        :rtype: tuple(string, dict)
+        """
+        if not objs:
+            return '', []
+        cls = type(objs[0])
+        query = DatabaseConnectorPostgresql.get_query_insert_template(table_name, cls, use_name_hints)
+        _, _, pack = DatabaseConnectorPostgresql.get_insert_plan(cls, use_name_hints)
+        rows = [pack(obj) for obj in objs]
         return query, rows
 
+    @staticmethod
+    def get_query_create_temp_table(temp_table_name: str, table_name: str, columns: List[str]) -> str:
+        """Generate SQL query to create a temporary table with the given columns of an existing table.
+        The temporary table is dropped at the end of the transaction.
+
+        :param temp_table_name: temporary table name.
+        :param table_name: table name from which to copy the column types.
+        :param columns: column names.
+        :return: SQL query.
+        :rtype: string
+        """
+        query = f"CREATE TEMP TABLE {temp_table_name} ON COMMIT DROP AS SELECT {', '.join(columns)} FROM {table_name} WITH NO DATA;"
+        return query
+
+    @staticmethod
+    def get_query_insert_from_table(table_name: str, source_table_name: str, columns: List[str], columns_conflict: List[str]) -> str:
+        """Generate SQL query to insert all rows from one table into another.
+
+        :param table_name: destination table name.
+        :param source_table_name: source table name.
+        :param columns: column names.
+        :param columns_conflict: columns for which conflicting rows are ignored.
+        :return: SQL query.
+        :rtype: string
+        """
+        columns_str = ', '.join(columns)
+        conflict_expression = f" ON CONFLICT ({', '.join(columns_conflict)}) DO NOTHING" if columns_conflict else ""
+        query = f"INSERT INTO {table_name} ({columns_str}) SELECT {columns_str} FROM {source_table_name}{conflict_expression};"
+        return query
+
     @staticmethod
     def get_query_db_version() -> str:
         """Generate SQL query to get the DB version.
@@ -242,12 +511,33 @@ class DatabaseConnectorPostgresql(DatabaseConnector):
         return query
 
     @staticmethod
-    def get_query_select_all(table_name: str) -> str:
+    def get_query_select_all(table_name: str, cls: Optional[Type[pydantic.BaseModel]] = None) -> str:
         """Generate SQL query to get all rows from table.
 
         :param table_name: table name
+        :param cls: optional pydantic class object reference value. If provided then only its fields are selected,
+            and NULL values are replaced in the DB with a default: '' if of type string, 0 if of type int.
+        :return: SQL query.
+        :rtype: string
+        """
+        if cls is None:
+            return f'SELECT * FROM {table_name}'
+        columns = []
+        for key, field in cls.model_fields.items():
+            default = _SQL_NULL_DEFAULTS.get(field.annotation)  # type: ignore
+            columns.append(f"COALESCE({key}, {default}) AS {key}" if default else key)
+        query = f"SELECT {', '.join(columns)} FROM {table_name}"
+        return query
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def get_query_select_all_json(table_name: str, cls: Type[pydantic.BaseModel]) -> str:
+        """Generate SQL query to get all rows from table as a single JSON array. The result is cached per table and class.
+
+        :param table_name: table name
+        :param cls: pydantic class object reference value, see `get_query_select_all`.
         :return: SQL query.
         :rtype: string
         """
-        query = f'SELECT * FROM {table_name}'
+        query = f'SELECT json_agg(t) FROM ({DatabaseConnectorPostgresql.get_query_select_all(table_name, cls)}) t'
         return query
@@ -1,4 +1,5 @@
 import asyncio
+import math
 
 
 class TooManyTriesException(Exception):
@@ -36,24 +37,30 @@ def retry(**kwargs):
     max_interval = kwargs.get('max_interval', None)
     logger = kwargs.get('logger', None)
 
+    if max_interval is None:
+        max_interval = math.inf
+    # the delay schedule is the same for every call, so compute it only once
+    delays = tuple(min(delay * backoff**attempt, max_interval) for attempt in range(tries))
+
     def decorator(func):
 
         async def wrapper(*args, **kwargs):
-            current_delay = delay
             for attempt in range(tries):
                 try:
                     if logger:
-                        logger.debug(f"{func.__name__} will attempt {attempt + 1} of {tries}")
+                        # lazy formatting, only done if the message is going to be logged
+                        logger.debug("%s will attempt %d of %d", func.__name__, attempt + 1, tries)
                     return await func(*args, **kwargs)
                 except Exception as exc:
+                    last_attempt = attempt + 1 == tries
                     if logger:
-                        msg = f"Error on attempt {attempt + 1}. Will sleep for {current_delay} seconds."
-                        msg += f" Exception: {exc.__class__} Error message: {str(exc)}"
-                        logger.error(msg)
-                    current_delay *= backoff
-                    if current_delay > max_interval:
-                        current_delay = max_interval
-                    await asyncio.sleep(current_delay)
+                        if last_attempt:
+                            logger.error("Error on attempt %d. Exception: %s Error message: %s", attempt + 1, exc.__class__, exc)
+                        else:
+                            logger.error("Error on attempt %d. Will sleep for %s seconds. Exception: %s Error message: %s", attempt + 1,
+                                         delays[attempt], exc.__class__, exc)
+                    if not last_attempt:
+                        await asyncio.sleep(delays[attempt])
             raise TooManyTriesException(f"{func.__name__} failed after {tries} attempts")
 
         return wrapper
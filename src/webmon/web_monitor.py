@@ -1,15 +1,22 @@
 import asyncio
+import codecs
 import csv
+import email.utils
+import functools
+import itertools
 import json
 import logging
 import os
+import random
 import re
 import sys
 import time
-from types import SimpleNamespace
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
 
-from aiohttp import ClientConnectorDNSError, ClientSession, ClientTimeout, TCPConnector
+from aiohttp import ClientConnectorDNSError, ClientResponse, ClientSession, ClientTimeout, TCPConnector
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import DefaultResolver
 
 from .database_connector_factory import DatabaseConnectorFactory, DatabaseType
 from .healthcheck import Healthcheck, RegexMatchStatus
@@ -17,24 +24,73 @@ from .website import Website
 
 logger = logging.getLogger("webmonitor")
 
+_CSV_FIELDS = ['host', 'interval', 'regex']
+# defaults for the missing URL parts, keyed by (has protocol, has port, is https)
+_URL_DEFAULTS = {
+    (False, False, False): ('https', '443'),
+    (False, True, True): ('https', ''),
+    (False, True, False): ('http', ''),
+    (True, False, True): ('', '443'),
+    (True, False, False): ('', '80'),
+}
+# headers of a browser, since some sites reject requests from other clients
+_REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br, zstd',
+    'Connection': 'keep-alive',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Priority': 'u=0, i',
+    'Referer': 'https://www.google.com/',
+}
+# the response body is read in chunks of this size when checking its regex, and only up to the max size
+_BODY_CHUNK_SIZE = 64 * 1024
+_BODY_MAX_SIZE = 1024 * 1024
+# status codes of a site asking to slow down, the check interval is doubled on each one up to 2**_MAX_BACKOFF_LEVEL times
+_BACKOFF_STATUS_CODES = frozenset({429, 503})
+_MAX_BACKOFF_LEVEL = 5
+# escapes, character classes, `.` and inline flags (eg: `\w` or `(?i)`) match non ASCII characters differently on bytes than on str
+_BYTES_UNSAFE_REGEX = re.compile(r'[\\.\[]|\(\?')
+# `$`, `\Z`, word boundaries and lookarounds depend on what follows, so they can match a partial body but not the whole one
+_BODY_END_DEPENDENT_REGEX = re.compile(r'\$|\\[ZbB]|\(\?<?[=!]')
+# status codes of a server rejecting HEAD requests
+_HEAD_UNSUPPORTED_STATUS_CODES = frozenset({405, 501})
+
 
 class WebMonitor:
     """Monitors health status of websites and saves results to a DB.
     """
 
-    def __init__(self, db_config: str, site_list: str, num_checks: int):
+    def __init__(self,
+                 db_config: str,
+                 site_list: str,
+                 num_checks: int,
+                 max_concurrent_requests: int = 100,
+                 resolver: Optional[AbstractResolver] = None):
         """Constructor. Lazy initialization.
 
         :param db_config: filename with DB config
         :param site_list: filename with list of websites to check
         :param num_checks: how many checks to perform per website before finishing. Use -1 for infinite.
+        :param max_concurrent_requests: max number of simultaneous web requests across all websites.
+        :param resolver: DNS resolver shared by all websites (eg: a stub for tests). Defaults to aiohttp's default resolver.
         """
         self.db_config = db_config  # after proper init it will be a map with the DB config
         self.site_list = site_list  # after proper init it will be a list of website healthcheck rules
         self.tablename_website = 'website'
         self.tablename_healthcheck = 'healthcheck'
         self.num_checks = num_checks
+        self.max_concurrent_requests = max_concurrent_requests
         self.dbc = None  # DB connector
+        self.healthcheck_batch_size = 100  # max number of healthchecks inserted in the DB at once
+        self.healthcheck_flush_interval = 1.0  # max seconds a healthcheck waits in the queue before being inserted
+        self.healthcheck_writers = 1  # number of concurrent healthcheck writers, each with its own queue and DB connection
+        self.healthcheck_queues: List[asyncio.Queue] = []  # pending healthchecks, a None entry stops the writer
+        self.resolver = resolver  # DNS resolver shared by all websites
 
     async def run(self, action: str) -> None:
         """Main entry point. Performs selected action.
@@ -44,8 +100,10 @@ class WebMonitor:
             If 'drop-tables' it drops the tables used for websites and healthchecks.
         """
         if action in ['monitor', 'drop-tables']:
-            with open(self.db_config, 'r') as file:
-                self.db_config = json.load(file)
+            # only parse the config file once, so that run can be called again
+            if isinstance(self.db_config, str):
+                with open(self.db_config, 'r') as file:
+                    self.db_config = json.load(file)
             db_type = DatabaseType[self.db_config['db_type'].upper()]  # type: ignore
             self.dbc = await DatabaseConnectorFactory(db_type, self.db_config).get_connector()  # type: ignore
             await self.dbc.open()  # type: ignore
@@ -55,7 +113,7 @@ class WebMonitor:
         elif action == 'drop-tables':
             await self._drop_tables()
         else:
-            logging.fatal(f'Invalid action: ${action}')
+            logger.fatal('Invalid action: %s', action)
         await self._finish()
 
     async def _finish(self) -> None:
@@ -63,14 +121,22 @@ class WebMonitor:
             await self.dbc.close()  # type: ignore
 
     async def _drop_tables(self) -> None:
-        await self.dbc.execute_drop_table(self.tablename_healthcheck)  # type: ignore
-        await self.dbc.execute_drop_table(self.tablename_website)  # type: ignore
+        await self.dbc.execute_drop_tables([self.tablename_healthcheck, self.tablename_website])  # type: ignore
 
     async def _prepare(self) -> None:
         """Create DB tables. Process list of websites to healthcheck. Configure system resources limit.
         """
-        await self.dbc.execute_create_table(self.tablename_website, Website)  # type: ignore
-        await self.dbc.execute_create_table(self.tablename_healthcheck, Healthcheck)  # type: ignore
+        # optional settings for writing the healthchecks
+        self.healthcheck_batch_size = int(self.db_config.get('hc_batch_size', self.healthcheck_batch_size))  # type: ignore
+        if self.healthcheck_batch_size < 1:
+            # it also bounds the queues of the writers, which don't have a bound when it's 0 or less
+            logger.fatal('Invalid hc_batch_size in DB config, must be at least 1: %d', self.healthcheck_batch_size)
+            await self._finish()
+            sys.exit(1)
+        self.healthcheck_writers = max(1, int(self.db_config.get('hc_writer_concurrency', self.healthcheck_writers)))  # type: ignore
+        async with self.dbc.scope():  # type: ignore
+            await self.dbc.execute_create_table(self.tablename_website, Website)  # type: ignore
+            await self.dbc.execute_create_table(self.tablename_healthcheck, Healthcheck)  # type: ignore
         # if a website list was provided then read it and setup the DB
         if self.site_list:
             if self.site_list.endswith('.csv') and os.path.exists(self.site_list):
@@ -78,7 +144,7 @@ class WebMonitor:
                 await self.dbc.execute_create_table(self.tablename_website, Website)  # type: ignore
                 await self._db_insert_many_website_entry(self.site_list)  # type: ignore
             else:
-                logger.fatal(f"Invalid file provided. Either file doesn't exist or it doesn't have a .csv extension: {self.site_list}")
+                logger.fatal("Invalid file provided. Either file doesn't exist or it doesn't have a .csv extension: %s", self.site_list)
                 await self._finish()
                 sys.exit(1)
         # always read website list from the DB (either due to user option, or just to have website_id info as per the DB)
@@ -89,58 +155,87 @@ class WebMonitor:
     def _read_sites_from_file(self) -> None:
         """Read list of websites to perform health checks from a CSV file.
         """
-        delimiter = ','
-        split_row = lambda row: (row[0], row[1], row[2]) if len(row) == 3 else (row[0], row[1], '')
         sites = []
         with open(self.site_list, 'r') as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=delimiter)
-            for idx, row in enumerate(csv_reader):
-                if not row:  # skip blank lines
-                    continue
-                if idx == 0 and f'host{delimiter}interval' in str(row):
-                    continue
+            csv_reader = csv.reader(csv_file, delimiter=',')
+            # skip the header, if there is one
+            first_row = next(csv_reader, None)
+            if first_row and first_row[:2] != _CSV_FIELDS[:2]:
+                csv_reader = itertools.chain([first_row], csv_reader)  # type: ignore
+            for row in csv_reader:
+                if not row:
+                    continue  # blank line
+                # a missing regex column defaults to ''
+                host, interval, regex = (row + ['', ''])[:3]
+                try:
+                    interval_seconds = int(interval) if interval else None
+                except ValueError:
+                    logger.fatal('Invalid interval in CSV file in row: %s', row)
+                    sys.exit(1)
+                if interval_seconds is None:
+                    logger.fatal('Malforded entry (missing column?) in CSV file in row: %s', row)
+                    sys.exit(1)
+                if regex:
+                    # fail on startup rather than when checking the website (the compiled regex is cached for then)
+                    try:
+                        WebMonitor.get_regex_pattern(regex)
+                    except re.error as exp:
+                        logger.fatal('Invalid regex (%s) in CSV file in row: %s', exp, row)
+                        sys.exit(1)
                 try:
-                    url, interval, regex = split_row(row)
-                except:
-                    logger.fatal(f'Malforded entry (missing column?) in CSV file in row: {row}')
+                    url = WebMonitor.get_valid_url(host, False)  # better disable any "magic" for non-naked domain
+                except ValueError as exp:
+                    logger.fatal('Invalid host (%s) in CSV file in row: %s', exp, row)
                     sys.exit(1)
-                url = WebMonitor.get_valid_url(url, False)  # better disable any "magic" for non-naked domain
-                sites.append(Website(website_id=-1, url_uq=url, interval=interval, regex=regex))
+                sites.append(Website(website_id=-1, url_uq=url, interval=interval_seconds, regex=regex))
         self.site_list = sites  # type: ignore
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def get_valid_url(url: str, no_naked_domain: bool = False) -> str:
-        """Receives a malformed url and returns a well formed one.
+        """Receives a malformed url and returns a well formed one. Results are cached.
 
         :param url: input url
         :param no_naked_domain: if true then it will append `www.` to any input naked domain
         :return: a well formed URL
         :rtype: string
+        :raises ValueError: if the port isn't a valid number
         """
-        url_regex = '(?P<protocol>http.*://)?(?P<host>[^:/ ]+).?(?P<port>[0-9]*)/?(?P<path>.*)'
-        m = re.search(url_regex, url)
-        protocol = m.group('protocol')  # type: ignore
-        host = m.group('host')  # type: ignore
-        port = m.group('port')  # type: ignore
-        path = m.group('path')  # type: ignore
+        parts = urlsplit(url)
+        if not parts.netloc:
+            # no protocol, so make sure the host isn't parsed as the protocol or the path
+            parts = urlsplit(f'//{url}')
+        protocol = parts.scheme
+        host = parts.hostname or ''
+        if ':' in host:
+            host = f'[{host}]'  # IPv6 address
+        port = str(parts.port or '')
+        path = parts.path.lstrip('/')
+        if parts.query:
+            path = f'{path}?{parts.query}'
         if no_naked_domain and host.count('.') < 2:
             host = f'www.{host}'
-        if not port and not protocol:
-            protocol = 'https'
-            port = 443
-        elif not protocol and port:
-            if port == 443:
-                protocol = 'https'
-            else:
-                protocol = 'http'
-        elif protocol and not port:
-            if protocol == 'https':
-                port = 443
-            else:
-                port = 80
+        key = (bool(protocol), bool(port), protocol == 'https' or port == '443')
+        default_protocol, default_port = _URL_DEFAULTS.get(key, ('', ''))
+        protocol = protocol or default_protocol
+        port = port or default_port
+        userinfo = parts.netloc.rpartition('@')[0]
+        if userinfo:
+            host = f'{userinfo}@{host}'
         url = f'{protocol}://{host}:{port}/{path}'.rstrip('/')
         return url
 
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_regex_pattern(regex: str) -> re.Pattern:
+        """Compiles regex. Results are cached, so websites with the same regex share the same pattern object.
+
+        :param regex: regular expression
+        :return: compiled regex
+        :rtype: re.Pattern
+        """
+        return re.compile(regex)
+
     async def _read_sites_from_db(self) -> None:
         """Read list of websites to perform health checks from the DB.
         """
@@ -162,31 +257,104 @@ class WebMonitor:
             resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft_limit, hard_limit))
         except:
             if logger:
-                logger.error(f"Failed to set new ulimits values (soft, hard) from ({soft_limit}, {hard_limit}) to ({new_soft_limit}, {hard_limit})")
+                logger.error("Failed to set new ulimits values (soft, hard) from (%s, %s) to (%s, %s)",
+                             soft_limit, hard_limit, new_soft_limit, hard_limit)
         new_soft_limit, new_hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
         if logger:
-            logger.info(f"OS's soft limit on max number of file descriptors: old value was {soft_limit}, new value is {new_soft_limit}.")
+            logger.info("OS's soft limit on max number of file descriptors: old value was %s, new value is %s.", soft_limit, new_soft_limit)
 
     async def _db_insert_many_website_entry(self, websites: List[Website]) -> None:
         """Insert multiple website healthcheck rules in the DB.
 
         :param websites: list of websites to insert in the table
         """
-        await self.dbc.execute_insert_many_into_table(self.tablename_website, websites)  # type: ignore
+        await self.dbc.execute_copy_many_into_table(self.tablename_website, websites)  # type: ignore
+
+    async def _db_insert_many_healthcheck_entry(self, checks: List[Healthcheck]) -> None:
+        """Insert results of multiple website health checks in the DB.
+
+        :param checks: list of healthchecks to insert in the table
+        """
+        await self.dbc.execute_copy_many_into_table(self.tablename_healthcheck, checks)  # type: ignore
 
-    async def _db_insert_healthcheck_entry(self, check: Healthcheck) -> None:
-        """Insert result of a website health check in the DB.
+    async def _healthcheck_writer(self, queue: asyncio.Queue) -> None:
+        """Inserts the queued healthchecks in the DB in batches, until it gets a None entry.
+
+        A batch is inserted when it reaches `healthcheck_batch_size` or when its first entry has waited for `healthcheck_flush_interval`.
+
+        :param queue: queue with the healthchecks to insert
         """
-        await self.dbc.execute_insert_many_into_table(self.tablename_healthcheck, [check])  # type: ignore
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            check = await queue.get()
+            if check is None:
+                break
+            batch = [check]
+            deadline = loop.time() + self.healthcheck_flush_interval
+            while len(batch) < self.healthcheck_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    check = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if check is None:
+                    done = True
+                    break
+                batch.append(check)
+            await self._db_insert_many_healthcheck_entry(batch)
+            logger.debug('Finished inserting in DB %d check results', len(batch))
 
     async def _monitor(self) -> None:
-        """Creates and starts a coroutine for each website that needs to be monitored.
+        """Creates and starts a coroutine for each website that needs to be monitored, and `healthcheck_writers` to save their results.
+        """
+        sem = asyncio.Semaphore(self.max_concurrent_requests)
+        own_resolver = self.resolver is None
+        if own_resolver:
+            # uses aiodns if it's installed, otherwise getaddrinfo in a thread pool
+            self.resolver = DefaultResolver()
+        # bound the pending healthchecks, so that site tasks wait for the writers instead of using up memory if the DB is slow
+        queue_size = 10 * self.healthcheck_batch_size
+        self.healthcheck_queues = [asyncio.Queue(maxsize=queue_size) for _ in range(self.healthcheck_writers)]
+        writers = [asyncio.create_task(self._healthcheck_writer(queue)) for queue in self.healthcheck_queues]
+        tasks = [asyncio.create_task(self._healthcheck_website(website, sem)) for website in self.site_list]  # type: ignore
+        try:
+            # wait for all site tasks, but stop as soon as any site task or writer fails
+            pending = set(tasks + writers)
+            while any(not task.done() for task in tasks):
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()  # type: ignore
+                    if task in writers:
+                        raise RuntimeError('Healthcheck writer stopped before the site tasks finished')
+        finally:
+            # if a task failed (or we got cancelled) then stop the others, like asyncio.TaskGroup does (which needs python 3.11)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                # flush any pending results
+                for queue, writer in zip(self.healthcheck_queues, writers):
+                    await WebMonitor._stop_healthcheck_writer(queue, writer)
+                await asyncio.gather(*writers)
+            finally:
+                if own_resolver:
+                    await self.resolver.close()  # type: ignore
+                    self.resolver = None
+
+    @staticmethod
+    async def _stop_healthcheck_writer(queue: asyncio.Queue, writer: asyncio.Task) -> None:
+        """Queues the None entry that stops writer, without blocking forever if writer already stopped with its queue full.
+
+        :param queue: queue of the writer
+        :param writer: healthcheck writer task
         """
-        sem = asyncio.Semaphore(100)
-        tasks = []
-        for website in self.site_list:
-            tasks.append(self._healthcheck_website(website, sem))  # type: ignore
-        await asyncio.gather(*tasks)
+        put = asyncio.ensure_future(queue.put(None))
+        await asyncio.wait([put, writer], return_when=asyncio.FIRST_COMPLETED)
+        put.cancel()
 
     async def _healthcheck_website(self, website: Website, sem: asyncio.Semaphore) -> None:
         """Continuously performs healthchecks on website. Makes http request and saves result in the DB.
@@ -194,48 +362,181 @@ class WebMonitor:
         :param website: website info
         :param sem: semaphore to control number of simultaneous connections
         """
-        request_headers = {
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br, zstd',
-            'Connection': 'keep-alive',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Priority': 'u=0, i',
-            'Referer': 'https://www.google.com/',
-        }
         timeout_seconds = 15
         max_size_response = 8190 * 2  # double the default size (some sites, eg twitter, would trigger an exception because of it)
         num_checks = self.num_checks
+        # each website always uses the same writer
+        queue = self.healthcheck_queues[website.website_id % len(self.healthcheck_queues)]
+        url = website.url_uq
+        interval = website.interval
+        delay: float = interval
+        backoff_level = 0
         regex_pattern = None
         if website.regex:
-            regex_pattern = re.compile(website.regex)
-        connector = TCPConnector(limit=None, enable_cleanup_closed=True, force_close=True)  # type: ignore  # limit=None for no limit
+            regex_pattern = WebMonitor.get_regex_pattern(website.regex)
+        dns_cache_seconds = 900  # the default of 10 seconds would expire between most checks
+        # keep the connection open until the next check, if the server closed it by then aiohttp retries the request on a new one
+        keepalive_seconds = interval + timeout_seconds
+        # each website has its own session and only makes one request at a time (limit=0 for no limit across redirect hosts)
+        connector = TCPConnector(limit=0, limit_per_host=1, ttl_dns_cache=dns_cache_seconds, enable_cleanup_closed=True,
+                                 keepalive_timeout=keepalive_seconds, resolver=self.resolver)
         total_timeout = ClientTimeout(total=timeout_seconds)
         async with ClientSession(connector=connector, timeout=total_timeout, max_line_size=max_size_response,
                                  max_field_size=max_size_response) as session:
+            loop = asyncio.get_running_loop()
+            # spread the first checks over the first interval, so that all websites don't make requests at the same time
+            next_time = loop.time() - random.uniform(0, interval)
             while num_checks != 0 or self.num_checks == -1:
                 num_checks -= 1
-                await asyncio.sleep(website.interval)
-                check = await self._request_website(session, website, sem, request_headers, regex_pattern)  # type: ignore
-
-                msg = f'Got HTTP response code [{check.http_status_code}] for URL: {website.url_uq}'
-                if check.http_status_code >= 300:
-                    logger.error(msg)
-                else:
-                    logger.info(msg)
+                # sleep until the next check is due, so the time spent on each check doesn't add up over time
+                next_time += delay
+                now = loop.time()
+                if next_time < now:
+                    next_time = now  # running late, so check right away but don't try to catch up
+                await asyncio.sleep(next_time - now)
+                check, retry_after = await self._request_website(session, website, sem, _REQUEST_HEADERS, regex_pattern)  # type: ignore
+                delay, backoff_level = WebMonitor.get_next_delay(interval, backoff_level, check.http_status_code, retry_after)
+
+                log_level = logging.ERROR if check.http_status_code >= 300 else logging.INFO
+                logger.log(log_level, 'Got HTTP response code [%d] for URL: %s', check.http_status_code, url)
                 if check.error_message:
-                    check.error_message = f"{website.url_uq} {check.error_message}"
+                    check.error_message = f"{url} {check.error_message}"
                     check.error_message = check.error_message[:300]  # trim error message to something reasonable
 
-                await self._db_insert_healthcheck_entry(check)
-                logger.debug(f'Finished inserting in DB the check results for: {website.url_uq}')
+                await queue.put(check)
+
+    @staticmethod
+    def get_next_delay(interval: int, backoff_level: int, status_code: int, retry_after: Optional[float]) -> Tuple[float, int]:
+        """Computes the delay until the next check, backing off while the site asks to slow down.
+
+        :param interval: seconds between checks
+        :param backoff_level: backoff level of the previous check, 0 if it wasn't backing off
+        :param status_code: http status code of the check
+        :param retry_after: seconds to wait requested by the site (if any)
+        :return: seconds until the next check, and the new backoff level
+        :rtype: Tuple[float, int]
+        """
+        if status_code not in _BACKOFF_STATUS_CODES:
+            return interval, 0
+        # wait at least as long as the site asked for, but never longer than the max backoff
+        backoff_level = min(backoff_level + 1, _MAX_BACKOFF_LEVEL)
+        max_delay = interval * 2 ** _MAX_BACKOFF_LEVEL
+        return min(max(interval * 2 ** backoff_level, retry_after or 0), max_delay), backoff_level
+
+    @staticmethod
+    def get_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parses the value of a Retry-After header, which is either a number of seconds or an HTTP date.
+
+        :param value: header value
+        :return: seconds to wait, or None if missing or malformed
+        :rtype: float
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, date.timestamp() - time.time())
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_bytes_regex_pattern(regex: str) -> Optional[re.Pattern]:
+        """Compiles an ASCII only regex as a bytes pattern, so that it can search a response body without decoding it.
+
+        Only regexes that match the same on bytes as on str are compiled, ie without escapes, character classes, `.` or inline flags.
+
+        :param regex: regular expression
+        :return: compiled bytes regex, or None if regex isn't ASCII only or could match differently on bytes
+        :rtype: re.Pattern
+        """
+        if not regex.isascii() or _BYTES_UNSAFE_REGEX.search(regex):
+            return None
+        return re.compile(regex.encode('ascii'))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def can_search_partial_body(regex: str) -> bool:
+        """Checks if a match of regex on the start of a body is also a match on the whole body, so the search can stop early.
+
+        :param regex: regular expression
+        :return: false if regex has assertions on what follows a match, like `$`, `\\Z`, `\\b` or lookarounds
+        :rtype: bool
+        """
+        return not _BODY_END_DEPENDENT_REGEX.search(regex)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def is_ascii_compatible(charset: str) -> bool:
+        """Checks if ASCII text is encoded as is in charset (eg: utf-8, latin-1, but not utf-16).
+
+        :param charset: name of the charset
+        :return: true if the charset is ASCII compatible
+        :rtype: bool
+        """
+        try:
+            return 'html'.encode(charset) == b'html'
+        except LookupError:
+            return False
+
+    @staticmethod
+    async def search_response(resp: ClientResponse, regex_pattern: re.Pattern, max_size: int = _BODY_MAX_SIZE) -> bool:
+        """Searches the response body for regex, reading it in chunks and stopping on the first match.
+
+        Only the first `max_size` bytes (rounded up to a whole chunk) of the body are searched.
+        The body read so far is searched after each chunk, unless regex depends on what follows a match (eg: `$`),
+        in which case it's only searched once the whole body (or `max_size`) was read.
+        The body is only decoded if the body charset isn't ASCII compatible or regex can't be searched as bytes.
+
+        :param resp: http response
+        :param regex_pattern: regex pattern to check html for
+        :param max_size: max number of bytes to read from the body
+        :return: true if the regex matched the body
+        :rtype: bool
+        """
+        charset = 'utf-8'
+        if resp.charset:
+            try:
+                charset = codecs.lookup(resp.charset).name
+            except LookupError:
+                logger.debug('Unknown charset %s, decoding the body as utf-8 instead', resp.charset)
+        early_exit = WebMonitor.can_search_partial_body(regex_pattern.pattern)
+        bytes_pattern = None
+        if WebMonitor.is_ascii_compatible(charset):
+            bytes_pattern = WebMonitor.get_bytes_regex_pattern(regex_pattern.pattern)
+        if bytes_pattern:
+            body = bytearray()
+            async for chunk in resp.content.iter_chunked(_BODY_CHUNK_SIZE):
+                body += chunk
+                if early_exit and bytes_pattern.search(body):
+                    return True
+                if len(body) >= max_size:
+                    break
+            # with an early exit the whole body was already searched
+            return not early_exit and bool(bytes_pattern.search(body))
+        decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+        html = ''
+        size = 0
+        async for chunk in resp.content.iter_chunked(_BODY_CHUNK_SIZE):
+            size += len(chunk)
+            html += decoder.decode(chunk)
+            if early_exit and regex_pattern.search(html):
+                return True
+            if size >= max_size:
+                break
+        # flush any incomplete character left in the decoder
+        tail = decoder.decode(b'', final=True)
+        if early_exit and not tail:
+            return False
+        html += tail
+        return bool(regex_pattern.search(html))
 
     async def _request_website(self, session: ClientSession, website: Website, sem: asyncio.Semaphore, headers: dict,
-                               regex_pattern: re.Pattern) -> "Healthcheck":
+                               regex_pattern: re.Pattern) -> Tuple["Healthcheck", Optional[float]]:
         """Makes HTTP request.
 
         Makes an HTTP request against website according to defined time interval.
@@ -246,55 +547,69 @@ class WebMonitor:
         :param sem: semaphore to control number of simultaneous connections
         :param headers: http request headers
         :param regex_pattern: regex pattern to check html for
-        :return: healthcheck results
-        :rtype: Healthcheck
+        :return: healthcheck results, and the seconds to wait requested by the site in a Retry-After header (if any)
+        :rtype: Tuple[Healthcheck, Optional[float]]
         """
         decimal_places = 3
         resp = None
         status_code = -1
         error_message = ''
-        logger.debug(f'Will make a web request for: {website.url_uq}')
+        logger.debug('Will make a web request for: %s', website.url_uq)
         request_timestamp = time.time()
-        html = ''
+        start_time = time.perf_counter()  # not affected by system clock updates
+        regex_match = False
+        retry_after = None
 
         # make request
         try:
-            logger.debug(f'Waiting for semaphore unlock to make web request for: {website.url_uq}')
+            logger.debug('Waiting for semaphore unlock to make web request for: %s', website.url_uq)
             async with sem:
-                logger.debug(f'Semaphore unlocked for making web request for: {website.url_uq}')
-                resp = await session.request(method="GET", headers=headers, url=website.url_uq)
-                logger.debug(f'OKed making web request for: {website.url_uq}')
-                if website.regex:
-                    html = await resp.text()
-                resp.close()  # https://github.com/aio-libs/aiohttp/issues/5277#issuecomment-944448361
+                logger.debug('Semaphore unlocked for making web request for: %s', website.url_uq)
+                # without a regex the body isn't needed, but fallback to GET for servers that don't support HEAD
+                if not website.regex:
+                    resp = await session.request(method="HEAD", headers=headers, url=website.url_uq)
+                    if resp.status in _HEAD_UNSUPPORTED_STATUS_CODES:
+                        resp.release()
+                        resp = None
+                if resp is None:
+                    resp = await session.request(method="GET", headers=headers, url=website.url_uq)
+                logger.debug('OKed making web request for: %s', website.url_uq)
+                try:
+                    if website.regex:
+                        regex_match = await WebMonitor.search_response(resp, regex_pattern)
+                finally:
+                    # returns the connection to the pool if the body was fully read, otherwise it gets closed
+                    resp.release()
             status_code = resp.status
+            if status_code in _BACKOFF_STATUS_CODES:
+                retry_after = WebMonitor.get_retry_after(resp.headers.get('Retry-After'))
         except asyncio.TimeoutError as exp:
-            logger.debug(f'FAILed making web request for: {website.url_uq}')
+            logger.debug('FAILed making web request for: %s', website.url_uq)
             status_code = 598  # (Unofficial code) Network read timeout error
-            error_message += f"{str(exp.__class__)} {str(exp)}"
+            error_message = f"{str(exp.__class__)} {str(exp)}"
         except ClientConnectorDNSError as exp:
-            logger.debug(f'FAILed DNS resolution for: {website.url_uq}')
+            logger.debug('FAILed DNS resolution for: %s', website.url_uq)
             status_code = 530  # (Unofficial code) Can't resolve the requested DNS record
-            error_message += f"{str(exp.__class__)} {str(exp)}"
+            error_message = f"{str(exp.__class__)} {str(exp)}"
         except Exception as exp:
             status_code = 555  # observed expections include: ClientConnectorError, ClientOSError
-            error_message += f"{str(exp.__class__)} {str(exp)}"
-        response_time = time.time() - request_timestamp
+            error_message = f"{str(exp.__class__)} {str(exp)}"
+        response_time = time.perf_counter() - start_time
 
         # check regex
-        if resp and website.regex:
-            if html and regex_pattern.search(html):
-                match_status = RegexMatchStatus.OK
-            else:
-                match_status = RegexMatchStatus.FAIL
-        else:
+        if not resp or not website.regex:
             match_status = RegexMatchStatus.NA
+        elif regex_match:
+            match_status = RegexMatchStatus.OK
+        else:
+            match_status = RegexMatchStatus.FAIL
 
-        check = Healthcheck(check_id=-1,
-                            website_fk=website.website_id,
-                            request_timestamp=round(request_timestamp, decimal_places),
-                            response_time=round(response_time, decimal_places),
-                            http_status_code=status_code,
-                            regex_match_status=match_status,
-                            error_message=error_message)
-        return check
+        # all values already have the right types, so skip the pydantic validation
+        check = Healthcheck.model_construct(check_id=-1,
+                                            website_fk=website.website_id,
+                                            request_timestamp=round(request_timestamp, decimal_places),
+                                            response_time=round(response_time, decimal_places),
+                                            http_status_code=status_code,
+                                            regex_match_status=match_status,
+                                            error_message=error_message)
+        return check, retry_after
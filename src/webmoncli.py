@@ -2,22 +2,30 @@
 
 import argparse
 import asyncio
-import json
 import logging
 import sys
 from typing import List
 
 from webmon.web_monitor import WebMonitor
 
+try:
+    import uvloop  # faster event loop, not available on Windows
+except ImportError:
+    uvloop = None
+
 
 def setup_logging(level: str) -> None:
     level = logging.getLevelName(level)
-    logging.basicConfig(
-        format="%(asctime)s %(levelname)s:%(name)s: %(message)s",
-        level=level,  # logging.DEBUG,
-        datefmt="%H:%M:%S",
-        stream=sys.stderr,
-    )
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s:%(name)s: %(message)s", datefmt="%H:%M:%S"))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)  # logging.DEBUG
+    # skip collecting the record attributes that the format doesn't use
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging.logAsyncioTasks = False  # type: ignore  # python 3.12+
 
 
 def main(argv: List) -> None:
@@ -26,8 +34,12 @@ def main(argv: List) -> None:
     use_examples += "\n{} --db-config secrets/db_postgresql.json --sites-csv data/websites_top15.csv --number-healthchecks 5".format(argv[0])
     use_examples += "\n{} --db-config secrets/db_postgresql.json --sites-table --number-healthchecks -1".format(argv[0])
     use_examples += "\n{} --db-config secrets/db_postgresql.json --drop-tables".format(argv[0])
+    use_examples += "\n{} @run.args  # read the arguments from file run.args, one per line".format(argv[0])
 
-    parser = argparse.ArgumentParser(description=description, epilog=use_examples, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser = argparse.ArgumentParser(description=description,
+                                     epilog=use_examples,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     fromfile_prefix_chars='@')
 
     parser.add_argument('--log-level',
                         metavar=('LOG_LEVEL'),
@@ -60,29 +72,27 @@ def main(argv: List) -> None:
         sys.exit(1)
 
     if not args.db_config:
-        print("ERROR: a db config file needs to be provided.")
-        sys.exit(1)
-    else:
-        dbconfig_filename = args.db_config[0]
-    if not args.drop_tables and not args.number_healthchecks:
-        print("ERROR: the number of healtchecks needs to be provided. Use -1 for infinite number.")
-        sys.exit(1)
-    elif args.drop_tables:
+        parser.error("a db config file needs to be provided.")
+    dbconfig_filename = args.db_config[0]
+    if args.drop_tables:
+        action = 'drop-tables'
         number_healthchecks = 0
-    else:
+    elif args.sites_csv or args.sites_table:
+        action = 'monitor'
+        if not args.number_healthchecks:
+            parser.error("the number of healtchecks needs to be provided. Use -1 for infinite number.")
         number_healthchecks = int(args.number_healthchecks[0])
-    if args.sites_csv:
-        sites_filename = args.sites_csv[0]
     else:
-        sites_filename = ''
+        parser.error("one of --sites-csv, --sites-table or --drop-tables needs to be provided.")
+    sites_filename = args.sites_csv[0] if args.sites_csv else ''
 
     setup_logging(args.log_level[0])
     wm = WebMonitor(dbconfig_filename, sites_filename, number_healthchecks)
-    if args.sites_csv or args.sites_table:
-        action = 'monitor'
-    if args.drop_tables:
-        action = 'drop-tables'
-    asyncio.run(wm.run(action))
+    # only one event loop is ever created, see the README lessons learned
+    if uvloop:
+        uvloop.run(wm.run(action))
+    else:
+        asyncio.run(wm.run(action))
 
 
 if __name__ == '__main__':
@@ -7,6 +7,7 @@ import json
 from types import SimpleNamespace
 
 import pytest
+import pytest_asyncio
 
 from webmon.database_connector_postgresql import DatabaseConnectorPostgresql
 from webmon.website import Website
@@ -20,50 +21,47 @@ from webmon.website import Website
 class TestDatabaseConnectorPostgresql:
     loop: asyncio.AbstractEventLoop
 
-    db = None
     test_table_name = 'test_table'
 
-    async def setup(self):
+    @pytest_asyncio.fixture(scope="class", loop_scope="class")
+    async def db(self):
+        # the DB connection pool is opened once and shared by all the tests in the class
         test_db_config = os.path.join(os.path.dirname(__file__), '../../secrets/db_postgresql_container.json')
         with open(test_db_config, 'r') as file:
             test_db_config = json.load(file)
         cfg = SimpleNamespace(**{k: v for k, v in test_db_config.items()})
-        TestDatabaseConnectorPostgresql.db = DatabaseConnectorPostgresql(cfg.db_user, cfg.db_pass, cfg.db_name, cfg.db_host, cfg.db_port, cfg.db_ssl)
-        await TestDatabaseConnectorPostgresql.db.open()
+        db = DatabaseConnectorPostgresql(cfg.db_user, cfg.db_pass, cfg.db_name, cfg.db_host, cfg.db_port, cfg.db_ssl)
+        await db.open()
+        yield db
+        await db.close()
 
-    async def test_fetch_version(self):
-        if not TestDatabaseConnectorPostgresql.db:
-            await self.setup()
-        res = await TestDatabaseConnectorPostgresql.db.fetch_version()
+    async def test_fetch_version(self, db):
+        res = await db.fetch_version()
         assert 'PostgreSQL' in res[0]
         assert 'compiled by gcc' in res[0]
 
-    async def test_execute_table_lifecycle(self):
-        if not TestDatabaseConnectorPostgresql.db:
-            await self.setup()
+    async def test_execute_table_lifecycle(self, db):
         table_name = TestDatabaseConnectorPostgresql.test_table_name
         website = Website(website_id=-1, url_uq='https://foo.bar', interval=5, regex='')
         query = f"SELECT COUNT(*) FROM information_schema.tables WHERE table_name = '{table_name}'"
 
         try:
-            res = await TestDatabaseConnectorPostgresql.db.db_fetch(query)
+            res = await db.db_fetch(query)
             assert str(res[0]) == '<Record count=0>'
 
-            await TestDatabaseConnectorPostgresql.db.execute_create_table(table_name, website)
-            res = await TestDatabaseConnectorPostgresql.db.db_fetch(query)
+            await db.execute_create_table(table_name, website)
+            res = await db.db_fetch(query)
             assert str(res[0]) == '<Record count=1>'
 
-            await TestDatabaseConnectorPostgresql.db.execute_drop_table(table_name)
-            res = await TestDatabaseConnectorPostgresql.db.db_fetch(query)
+            await db.execute_drop_table(table_name)
+            res = await db.db_fetch(query)
             assert str(res[0]) == '<Record count=0>'
 
         finally:
             # clean up any failed test
-            await TestDatabaseConnectorPostgresql.db.execute_drop_table(table_name)
+            await db.execute_drop_table(table_name)
 
-    async def test_execute_insert_table(self):
-        if not TestDatabaseConnectorPostgresql.db:
-            await self.setup()
+    async def test_execute_insert_table(self, db):
         table_name = TestDatabaseConnectorPostgresql.test_table_name
         website1 = Website(website_id=-1, url_uq='https://foo.bar', interval=5, regex='')
         website2 = Website(website_id=-1, url_uq='https://matrix.bar', interval=10, regex='neo')
@@ -71,56 +69,116 @@ class TestDatabaseConnectorPostgresql:
         query_elem = f"SELECT * FROM {table_name} WHERE interval = 10"
 
         try:
-            await TestDatabaseConnectorPostgresql.db.execute_create_table(table_name, website1)
+            await db.execute_create_table(table_name, website1)
             # assert values can be inserted
-            await TestDatabaseConnectorPostgresql.db.execute_insert_into_table(table_name, website1)
-            await TestDatabaseConnectorPostgresql.db.execute_insert_into_table(table_name, website2)
-            res = await TestDatabaseConnectorPostgresql.db.db_fetch(query_count)
+            await db.execute_insert_into_table(table_name, website1)
+            await db.execute_insert_into_table(table_name, website2)
+            res = await db.db_fetch(query_count)
             assert str(res[0]) == '<Record count=2>'
             # assert primary key auto increments
-            res = await TestDatabaseConnectorPostgresql.db.db_fetch(query_elem)
+            res = await db.db_fetch(query_elem)
             assert res[0].get('website_id') == 2
             assert res[0].get('url_uq') == 'https://matrix.bar'
         finally:
             # clean up
-            await TestDatabaseConnectorPostgresql.db.execute_drop_table(table_name)
+            await db.execute_drop_table(table_name)
 
-    async def test_execute_insert_table_and_fetch_all(self):
-        if not TestDatabaseConnectorPostgresql.db:
-            await self.setup()
+    async def test_execute_insert_table_and_fetch_all(self, db):
         table_name = TestDatabaseConnectorPostgresql.test_table_name
         website1 = Website(website_id=1, url_uq='https://foo.bar', interval=5, regex='')
         website2 = Website(website_id=2, url_uq='https://matrix.bar', interval=10, regex='neo')
         try:
             # setup
-            await TestDatabaseConnectorPostgresql.db.execute_create_table(table_name, website1)
-            await TestDatabaseConnectorPostgresql.db.execute_insert_into_table(table_name, website1)
-            await TestDatabaseConnectorPostgresql.db.execute_insert_into_table(table_name, website2)
+            await db.execute_create_table(table_name, website1)
+            await db.execute_insert_many_into_table(table_name, [website1, website2])
             # test
-            res = await TestDatabaseConnectorPostgresql.db.fetch_all_from_table(table_name, Website)
+            res = await db.fetch_all_from_table(table_name, Website)
             # assert
             assert res[0] == website1
             assert res[1] == website2
         finally:
             # clean up
-            await TestDatabaseConnectorPostgresql.db.execute_drop_table(table_name)
+            await db.execute_drop_table(table_name)
 
-    async def test_execute_insert_many_table(self):
-        if not TestDatabaseConnectorPostgresql.db:
-            await self.setup()
+    async def test_execute_insert_many_table(self, db):
         table_name = TestDatabaseConnectorPostgresql.test_table_name
         website1 = Website(website_id=1, url_uq='https://foo.bar', interval=5, regex='')
         website2 = Website(website_id=2, url_uq='https://matrix.bar', interval=10, regex='neo')
         websites = [website1, website2]
         try:
             # setup
-            await TestDatabaseConnectorPostgresql.db.execute_create_table(table_name, website1)
-            await TestDatabaseConnectorPostgresql.db.execute_insert_many_into_table(table_name, websites)
+            await db.execute_create_table(table_name, website1)
+            await db.execute_insert_many_into_table(table_name, websites)
             # test
-            res = await TestDatabaseConnectorPostgresql.db.fetch_all_from_table(table_name, Website)
+            res = await db.fetch_all_from_table(table_name, Website)
             # assert
             assert res[0] == website1
             assert res[1] == website2
         finally:
             # clean up
-            await TestDatabaseConnectorPostgresql.db.execute_drop_table(table_name)
+            await db.execute_drop_table(table_name)
+
+    async def test_execute_copy_many_table(self, db):
+        table_name = TestDatabaseConnectorPostgresql.test_table_name
+        website1 = Website(website_id=1, url_uq='https://foo.bar', interval=5, regex='')
+        website2 = Website(website_id=2, url_uq='https://matrix.bar', interval=10, regex='neo')
+        websites = [website1, website2]
+        try:
+            # setup
+            await db.execute_create_table(table_name, website1)
+            await db.execute_copy_many_into_table(table_name, websites)
+            # duplicated entries are ignored
+            await db.execute_copy_many_into_table(table_name, websites)
+            # test
+            res = await db.fetch_all_from_table(table_name, Website)
+            # assert
+            assert len(res) == 2
+            assert res[0] == website1
+            assert res[1] == website2
+        finally:
+            # clean up
+            await db.execute_drop_table(table_name)
+
+    async def test_iterate_all_from_table(self, db):
+        table_name = TestDatabaseConnectorPostgresql.test_table_name
+        website1 = Website(website_id=1, url_uq='https://foo.bar', interval=5, regex='')
+        website2 = Website(website_id=2, url_uq='https://matrix.bar', interval=10, regex='neo')
+        websites = [website1, website2]
+        try:
+            # setup
+            await db.execute_create_table(table_name, website1)
+            await db.execute_insert_many_into_table(table_name, websites)
+            # test
+            res = [row async for row in db.iterate_all_from_table(table_name, Website, prefetch=1)]
+            # assert
+            assert res == websites
+        finally:
+            # clean up
+            await db.execute_drop_table(table_name)
+
+    async def test_db_pipeline(self, db):
+        table_name = TestDatabaseConnectorPostgresql.test_table_name
+        website = Website(website_id=-1, url_uq='https://foo.bar', interval=5, regex='')
+        query = "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = $1"
+
+        try:
+            await db.execute_create_table(table_name, website)
+            res = await db.db_pipeline([(query, (table_name, )), ('SELECT $1::int AS x', (42, ))])
+            assert str(res[0][0]) == '<Record count=1>'
+            assert str(res[1][0]) == '<Record x=42>'
+
+            await db.execute_drop_tables([table_name])
+            res = await db.db_fetch(f"SELECT COUNT(*) FROM information_schema.tables WHERE table_name = '{table_name}'")
+            assert str(res[0]) == '<Record count=0>'
+        finally:
+            # clean up any failed test
+            await db.execute_drop_table(table_name)
+
+    async def test_scope(self, db):
+        query = "SELECT pg_backend_pid() AS pid"
+        async with db.scope():
+            res1 = await db.db_fetch(query)
+            async with db.scope():
+                res2 = await db.db_fetch(query)
+        # all queries ran on the same connection
+        assert res1[0].get('pid') == res2[0].get('pid')
@@ -1,37 +1,44 @@
 import os
+import re
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../src/'))
+import pytest
+
+from webmon.database_connector import DatabaseConnector
 from webmon.database_connector_postgresql import DatabaseConnectorPostgresql
 from webmon.healthcheck import Healthcheck, RegexMatchStatus
 from webmon.website import Website
 
+_WHITESPACE_RE = re.compile(r'\s+')
+
 
 def clean(text):
-    return text.replace('\n', ' ').replace('  ', ' ').strip(' ')
+    return _WHITESPACE_RE.sub(' ', text).strip()
 
 
-def test_get_query_create_table():
-    website = Website(website_id=-1, url_uq='https://foo.bar', interval=5, regex='')
+_CHECK = Healthcheck(check_id=123,
+                     website_fk=33,
+                     request_timestamp=1718055080.050827,
+                     response_time=3.14,
+                     http_status_code=200,
+                     regex_match_status=RegexMatchStatus.OK,
+                     error_message='')
+_WEBSITE = Website(website_id=-1, url_uq='https://foo.bar', interval=5, regex='')
 
-    res = DatabaseConnectorPostgresql.get_query_create_table('website', website, True)
-    exp = 'CREATE TABLE IF NOT EXISTS website (\nwebsite_id SERIAL,\nurl_uq TEXT UNIQUE,\ninterval INT,\nregex TEXT,\nPRIMARY KEY (website_id)\n);'
-    assert clean(res) == clean(exp)
 
-    res = DatabaseConnectorPostgresql.get_query_create_table('website', website, False)
-    exp = 'CREATE TABLE IF NOT EXISTS website (\nwebsite_id INT,\nurl_uq TEXT,\ninterval INT,\nregex TEXT);'
-    assert clean(res) == clean(exp)
-
-    check = Healthcheck(check_id=123,
-                        website_fk=33,
-                        request_timestamp=1718055080.050827,
-                        response_time=3.14,
-                        http_status_code=200,
-                        regex_match_status=RegexMatchStatus.OK,
-                        error_message='')
-    res = DatabaseConnectorPostgresql.get_query_create_table('healthcheck', check, True)
-    exp = 'CREATE TABLE IF NOT EXISTS healthcheck (\ncheck_id SERIAL,\nwebsite_fk INT,\nrequest_timestamp FLOAT,\nresponse_time FLOAT,\nhttp_status_code INT,\nregex_match_status INT,\nerror_message TEXT,\nPRIMARY KEY (check_id)\n);'
+@pytest.mark.parametrize("table_name,obj,use_name_hints,exp", [
+    ('website', _WEBSITE, True,
+     'CREATE TABLE IF NOT EXISTS website (\nwebsite_id SERIAL,\nurl_uq TEXT UNIQUE,\ninterval INT,\nregex TEXT,\nPRIMARY KEY (website_id)\n);'),
+    ('website', _WEBSITE, False, 'CREATE TABLE IF NOT EXISTS website (\nwebsite_id INT,\nurl_uq TEXT,\ninterval INT,\nregex TEXT);'),
+    ('healthcheck', _CHECK, True, 'CREATE TABLE IF NOT EXISTS healthcheck (\ncheck_id SERIAL,\nwebsite_fk INT,\nrequest_timestamp FLOAT,\n'
+     'response_time FLOAT,\nhttp_status_code INT,\nregex_match_status INT,\nerror_message TEXT,\nPRIMARY KEY (check_id)\n);'),
+])
+def test_get_query_create_table(table_name, obj, use_name_hints, exp):
+    res = DatabaseConnectorPostgresql.get_query_create_table(table_name, obj, use_name_hints)
     assert clean(res) == clean(exp)
+    # the query is cached per table and class
+    assert DatabaseConnectorPostgresql.get_query_create_table(table_name, type(obj), use_name_hints) is res
 
 
 def test_get_query_drop_table():
@@ -42,13 +49,91 @@ def test_get_query_drop_table():
     assert clean(res) == clean(exp)
 
 
-def test_get_querypair_insert_many_into_table():
+@pytest.mark.parametrize("use_name_hints,exp_query,exp_data", [
+    (True, 'INSERT INTO website (url_uq, interval, regex) VALUES ($1, $2, $3) ON CONFLICT (url_uq) DO NOTHING;',
+     [('https://foo.bar', 5, ''), ('https://matrix.bar', 10, 'neo')]),
+    (False, 'INSERT INTO website (website_id, url_uq, interval, regex) VALUES ($1, $2, $3, $4) ;',
+     [(-1, 'https://foo.bar', 5, ''), (-1, 'https://matrix.bar', 10, 'neo')]),
+])
+def test_get_querypair_insert_many_into_table(use_name_hints, exp_query, exp_data):
     website1 = Website(website_id=-1, url_uq='https://foo.bar', interval=5, regex='')
     website2 = Website(website_id=-1, url_uq='https://matrix.bar', interval=10, regex='neo')
     websites = [website1, website2]
 
-    res_query, res_data = DatabaseConnectorPostgresql.get_query_insert_many_into_table('website', websites, True)
-    exp_query = 'INSERT INTO website (url_uq, interval, regex) VALUES ($1, $2, $3) ON CONFLICT (url_uq) DO NOTHING;'
-    exp_data = [('https://foo.bar', 5, ''), ('https://matrix.bar', 10, 'neo')]
+    res_query, res_data = DatabaseConnectorPostgresql.get_query_insert_many_into_table('website', websites, use_name_hints)
     assert res_query == exp_query
     assert res_data == exp_data
+
+
+def test_get_columns_rows_many_into_table():
+    check = Healthcheck(check_id=-1,
+                        website_fk=33,
+                        request_timestamp=1718055080.051,
+                        response_time=3.14,
+                        http_status_code=200,
+                        regex_match_status=RegexMatchStatus.OK,
+                        error_message='')
+
+    res_columns, res_conflict, res_rows = DatabaseConnectorPostgresql.get_columns_rows_many_into_table([check], True)
+    assert res_columns == ['website_fk', 'request_timestamp', 'response_time', 'http_status_code', 'regex_match_status', 'error_message']
+    assert res_conflict == []
+    assert res_rows == [(33, 1718055080.051, 3.14, 200, 1, '')]
+
+
+def test_get_query_insert_from_table():
+    res = DatabaseConnectorPostgresql.get_query_create_temp_table('tmp_website', 'website', ['url_uq', 'interval', 'regex'])
+    exp = 'CREATE TEMP TABLE tmp_website ON COMMIT DROP AS SELECT url_uq, interval, regex FROM website WITH NO DATA;'
+    assert res == exp
+
+    res = DatabaseConnectorPostgresql.get_query_insert_from_table('website', 'tmp_website', ['url_uq', 'interval', 'regex'], ['url_uq'])
+    exp = 'INSERT INTO website (url_uq, interval, regex) SELECT url_uq, interval, regex FROM tmp_website ON CONFLICT (url_uq) DO NOTHING;'
+    assert res == exp
+
+
+def test_get_query_select_all():
+    res = DatabaseConnectorPostgresql.get_query_select_all('website')
+    exp = 'SELECT * FROM website'
+    assert res == exp
+
+    res = DatabaseConnectorPostgresql.get_query_select_all('website', Website)
+    exp = ("SELECT COALESCE(website_id, 0) AS website_id, COALESCE(url_uq, '') AS url_uq, "
+           "COALESCE(interval, 0) AS interval, COALESCE(regex, '') AS regex FROM website")
+    assert res == exp
+
+    res = DatabaseConnectorPostgresql.get_query_select_all('healthcheck', Healthcheck)
+    exp = "SELECT COALESCE(check_id, 0) AS check_id, COALESCE(website_fk, 0) AS website_fk, request_timestamp, response_time, "
+    exp += "COALESCE(http_status_code, 0) AS http_status_code, regex_match_status, COALESCE(error_message, '') AS error_message FROM healthcheck"
+    assert res == exp
+
+
+def test_get_query_select_all_json():
+    res = DatabaseConnectorPostgresql.get_query_select_all_json('website', Website)
+    exp = "SELECT json_agg(t) FROM (SELECT COALESCE(website_id, 0) AS website_id, COALESCE(url_uq, '') AS url_uq, "
+    exp += "COALESCE(interval, 0) AS interval, COALESCE(regex, '') AS regex FROM website) t"
+    assert res == exp
+
+
+def test_json_to_pydantic_list():
+    rows_json = '[{"check_id": 1, "website_fk": 33, "request_timestamp": 1718055080.051, "response_time": 3.14, '
+    rows_json += '"http_status_code": 200, "regex_match_status": 1, "error_message": ""}]'
+    check = Healthcheck(check_id=1,
+                        website_fk=33,
+                        request_timestamp=1718055080.051,
+                        response_time=3.14,
+                        http_status_code=200,
+                        regex_match_status=RegexMatchStatus.OK,
+                        error_message='')
+
+    assert DatabaseConnector.json_to_pydantic_list(rows_json, Healthcheck) == [check]
+    assert DatabaseConnector.json_to_pydantic_list(None, Healthcheck) == []
+
+
+@pytest.mark.parametrize('cpu_count, min_size, max_size, exp_min_size, exp_max_size', [
+    (2, None, None, 5, 5),
+    (64, None, None, 10, 10),  # the default is capped on large hosts
+    (64, 0, 40, 0, 40),  # explicit values are kept as is
+])
+def test_pool_size_defaults(monkeypatch, cpu_count, min_size, max_size, exp_min_size, exp_max_size):
+    monkeypatch.setattr(os, 'cpu_count', lambda: cpu_count)
+    dbc = DatabaseConnectorPostgresql('user', 'pass', 'db', 'localhost', 5432, False, db_pool_min_size=min_size, db_pool_max_size=max_size)
+    assert (dbc.db_pool_min_size, dbc.db_pool_max_size) == (exp_min_size, exp_max_size)
@@ -6,7 +6,7 @@ import sys
 import pytest
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../src/'))
-from webmon.retry import retry
+from webmon.retry import TooManyTriesException, retry
 
 # Set up a logger for the test
 logger = logging.getLogger(__name__)
@@ -55,3 +55,20 @@ async def test_retry_permanent_failure():
     with pytest.raises(Exception):
         result = await mock_function(should_fail=True, fail_count=3)
     assert result is None
+
+
+call_count = 0
+
+
+@retry(tries=3, delay=0.01, backoff=2, logger=logger)
+async def mock_function_no_max_interval():
+    global call_count
+    call_count += 1
+    raise Exception(f"Simulated failure {call_count}")
+
+
+@pytest.mark.asyncio
+async def test_retry_no_max_interval():
+    with pytest.raises(TooManyTriesException):
+        await mock_function_no_max_interval()
+    assert call_count == 3